@@ -0,0 +1,59 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+# CLI モードで読み込まれるモジュールと、その際に読み込まれてはいけないモジュール
+CLI_MODULES = ["ptcam.app", "ptcam.tracker", "ptcam.tracker.cli_tracker_runner"]
+FORBIDDEN_PREFIXES = ("PyQt5", "ptcam.ui", "ptcam.tracker.gui_tracker_runner")
+
+PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = sorted(name for name in sys.modules if name.startswith({forbidden!r}))
+print(json.dumps({{"elapsed": elapsed, "forbidden": loaded}}))
+"""
+
+
+def measure(module, repeat):
+    samples = []
+    forbidden = []
+    for _ in range(repeat):
+        code = PROBE.format(module=module, forbidden=FORBIDDEN_PREFIXES)
+        output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result["elapsed"])
+        forbidden = result["forbidden"]
+    return min(samples), sorted(samples)[len(samples) // 2], forbidden
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ptcam import time in headless mode")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of fresh interpreters per module")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    results = {}
+    failed = False
+    for module in CLI_MODULES:
+        best, median, forbidden = measure(module, args.repeat)
+        results[module] = {"best_ms": best * 1000, "median_ms": median * 1000, "forbidden": forbidden}
+        failed = failed or bool(forbidden)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for module, result in results.items():
+            print(f"{module:40s} best={result['best_ms']:8.1f} ms  median={result['median_ms']:8.1f} ms")
+            if result["forbidden"]:
+                print(f"  GUI modules loaded: {', '.join(result['forbidden'])}")
+        print(f"Total benchmark time: {time.perf_counter() - started:.1f} s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1,10 @@
 def hello() -> str:
     return "Hello from ptcam!"
+
+
+def __getattr__(name):
+    # OpenCV を読み込むため、参照されたときに読み込む
+    if name in ("track", "TrackResult"):
+        from ptcam import aio
+        return getattr(aio, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,3 @@
+from .async_tracker import TrackResult, track
+
+__all__ = ["TrackResult", "track"]
\ No newline at end of file
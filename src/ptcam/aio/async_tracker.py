@@ -0,0 +1,132 @@
+import asyncio
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from ptcam.config.config import Config
+from ptcam.tracker.buffer_pool import BufferPool
+from ptcam.tracker.capture_source import CaptureSource
+from ptcam.tracker.latency_tracer import LatencyTracer
+from ptcam.tracker.tracker_processor import TrackerProcessor
+
+# frame は include_frames=True の場合のみ設定される
+TrackResult = namedtuple("TrackResult", ["frame_info", "results", "frame"])
+
+
+async def track(source=None, config=None, include_frames=False):
+    # async for result in track("rtsp://...", config): ...
+    config = Config(config.data, config.overrides) if config is not None else Config()
+    if source is not None:
+        config.override("rtsp_url", source)
+
+    loop = asyncio.get_running_loop()
+    # フレームを呼び出し側に渡す場合は再利用できないためプールを使わない
+    pool = None if include_frames else BufferPool(config)
+    tracer = LatencyTracer(config)
+    capture = CaptureSource(config, tracer, pool)
+    processor = TrackerProcessor(config, tracer, pool)
+    capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ptcam-capture")
+    process_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ptcam-process")
+    queue = asyncio.Queue(maxsize=config.get("async.max_pending", 2))
+    # トラッカーのリセットは処理スレッドで process_frame と直列に実行する
+    capture.add_listener(lambda state, metrics: process_executor.submit(processor.on_capture_state, state, metrics))
+    errors = []
+    dropped = [0]
+    capture_task = asyncio.create_task(_capture(loop, capture_executor, capture, queue, config, pool, errors, dropped))
+
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                if errors:
+                    raise errors[0]
+                return
+            frame, frame_info = item
+            try:
+                results = await loop.run_in_executor(
+                    process_executor, processor.process_frame, frame, frame_info.wall_time, frame_info
+                )
+            finally:
+                if pool is not None:
+                    pool.release(frame)
+            tracer.complete(frame_info)
+            yield TrackResult(frame_info, results, frame if include_frames else None)
+    finally:
+        capture.stop()
+        capture_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await capture_task
+        # 取り込みが先に終わっていた場合も、呼び出し側が受け取らなかったフレームを返す
+        _drain(queue, pool)
+        # 実行中の read() が戻ってから同じスレッドで解放する
+        await loop.run_in_executor(capture_executor, capture.close)
+        capture_executor.shutdown(wait=False)
+        process_executor.shutdown(wait=False)
+        tracer.dump()
+        if dropped[0]:
+            print(f"Dropped {dropped[0]} frames because processing fell behind capture.")
+
+
+async def _capture(loop, executor, capture, queue, config, pool, errors, dropped):
+    skip_frames = config.get("skip_frames", 0)
+    # 既定では処理が追いつくまで取り込みを待たせる。録画ファイルは間引くと欠落になるため常に待つ
+    drop_frames = config.get("async.drop_frames", False) and not capture.finite
+    counter = 0
+    try:
+        try:
+            while True:
+                read = executor.submit(capture.read)
+                try:
+                    ret, frame, frame_info = await asyncio.wrap_future(read, loop=loop)
+                except asyncio.CancelledError:
+                    # キャンセル時に実行中だった read() のフレームは戻り次第解放する
+                    read.add_done_callback(lambda future: _release_read(pool, future))
+                    raise
+                if not ret:
+                    break
+
+                counter += 1
+                if counter <= skip_frames:
+                    _release(pool, frame)
+                    continue
+                counter = 0
+
+                if drop_frames:
+                    # 処理が追いつかない場合は古いフレームを捨てて最新を優先する
+                    if queue.full():
+                        _release(pool, queue.get_nowait()[0])
+                        dropped[0] += 1
+                    queue.put_nowait((frame, frame_info))
+                else:
+                    try:
+                        await queue.put((frame, frame_info))
+                    except asyncio.CancelledError:
+                        _release(pool, frame)
+                        raise
+        except Exception as e:
+            errors.append(e)
+        # 終端ではキュー内のフレームを捨てずに、処理し終わるのを待って終了を知らせる
+        await queue.put(None)
+    except asyncio.CancelledError:
+        _drain(queue, pool)
+        queue.put_nowait(None)
+        raise
+
+
+def _drain(queue, pool):
+    while not queue.empty():
+        item = queue.get_nowait()
+        if item is not None:
+            _release(pool, item[0])
+
+
+def _release(pool, frame):
+    if pool is not None:
+        pool.release(frame)
+
+
+def _release_read(pool, future):
+    if future.cancelled() or future.exception() is not None:
+        return
+    ret, frame, _ = future.result()
+    if ret:
+        _release(pool, frame)
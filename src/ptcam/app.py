@@ -1,17 +1,63 @@
 import argparse
-from PyQt5.QtWidgets import QApplication
 from ptcam.config.config import Config
-from ptcam.ui.video_stream_app import VideoStreamApp
-from ptcam.tracker.cli_tracker_runner import CLITrackerRunner
 
 def main():
     parser = argparse.ArgumentParser(description="RTSP Object Tracking")
     parser.add_argument("--gui", action="store_true", help="Run in GUI mode")
+    parser.add_argument("--output", choices=["text", "ndjson", "binary", "socket"], help="Result output format in CLI mode")
+    parser.add_argument("--output-path", help="Output file or UNIX socket path")
+    parser.add_argument("--trace", metavar="PATH", help="Write per-frame latency spans as Chrome trace JSON")
+    subparsers = parser.add_subparsers(dest="command")
+    batch_parser = subparsers.add_parser("batch", help="Process recorded video files in parallel")
+    batch_parser.add_argument("inputs", nargs="+", help="Video files, directories or glob patterns")
+    batch_parser.add_argument("--output-dir", help="Directory for per-file result archives")
+    batch_parser.add_argument("--workers", type=int, help="Number of worker processes")
+    tune_parser = subparsers.add_parser("tune", help="Search Hough circle parameters on a labeled or synthetic frame set")
+    tune_source = tune_parser.add_mutually_exclusive_group(required=True)
+    tune_source.add_argument("--labels", help="JSON file mapping frame images to [[x, y, r], ...]")
+    tune_source.add_argument("--synthetic", type=int, metavar="N", help="Generate N synthetic frames")
+    tune_parser.add_argument("--trials", type=int, help="Number of random parameter sets to evaluate")
+    tune_parser.add_argument("--workers", type=int, help="Number of worker processes")
+    tune_parser.add_argument("--max-ms", type=float, help="Prefer parameters faster than this per HoughCircles call")
+    tune_parser.add_argument("--write", action="store_true", help="Save the selected parameters to config.yaml")
     args = parser.parse_args()
 
     config = Config()
+    if args.output:
+        config.override("output.format", args.output)
+    if args.output_path:
+        config.override("output.path", args.output_path)
+    if args.trace:
+        config.override("tracing.enabled", True)
+        config.override("tracing.output", args.trace)
+
+    if args.command == "batch":
+        from ptcam.batch.batch_runner import BatchRunner
+
+        runner = BatchRunner(config, args.output_dir, args.workers)
+        runner.run(args.inputs)
+    elif args.command == "tune":
+        from ptcam.batch.hough_tuner import HoughTuner, load_frames
+
+        if args.trials:
+            config.override("tuning.trials", args.trials)
+        if args.max_ms:
+            config.override("tuning.max_ms_per_call", args.max_ms)
+        frames, labels = load_frames(config, args.labels, args.synthetic)
+        tuner = HoughTuner(config, args.workers)
+        current, front, best = tuner.run(frames, labels)
+        print(f"Current:  F1={current['f1']:.3f} {current['ms_per_call']:.2f} ms/call {current['params']}")
+        for trial in front:
+            print(f"Pareto:   F1={trial['f1']:.3f} {trial['ms_per_call']:.2f} ms/call {trial['params']}")
+        print(f"Selected: F1={best['f1']:.3f} {best['ms_per_call']:.2f} ms/call {best['params']}")
+        if args.write:
+            tuner.apply(best)
+            print("Saved hough_params to config.yaml")
+    elif args.gui:
+        # GUI モードの場合のみ Qt を読み込む
+        from PyQt5.QtWidgets import QApplication
+        from ptcam.ui.video_stream_app import VideoStreamApp
 
-    if args.gui:
         app = QApplication([])
         main_window = VideoStreamApp(config)
         main_window.show()
@@ -20,6 +66,8 @@ def main():
         main_window.stop_tracking()
         return exit_code
     else:
+        from ptcam.tracker.cli_tracker_runner import CLITrackerRunner
+
         runner = CLITrackerRunner(config)
         runner.start()
 
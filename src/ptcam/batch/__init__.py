@@ -0,0 +1,4 @@
+from .batch_runner import BatchRunner, expand_inputs
+from .hough_tuner import HoughTuner
+
+__all__ = ["BatchRunner", "expand_inputs", "HoughTuner"]
\ No newline at end of file
@@ -0,0 +1,147 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from ptcam.config.config import Config
+from ptcam.tracker.tracker_processor import TrackerProcessor
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".avi", ".mov", ".h264", ".ts")
+COLUMNS = ("frame", "timestamp", "track_id", "x", "y", "w", "h", "distance")
+
+
+def expand_inputs(inputs):
+    paths = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            for name in sorted(os.listdir(pattern)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    paths.append(os.path.join(pattern, name))
+        else:
+            paths.extend(sorted(glob.glob(pattern)))
+    # 重複して指定されたファイルは一度だけ処理する
+    return list(dict.fromkeys(paths))
+
+
+def process_chunk(config_data, config_overrides, path, start, end, warmup):
+    # チャンク境界ではトラッカーを温めるため、手前の warmup フレームから処理する
+    config = Config(config_data, config_overrides)
+    processor = TrackerProcessor(config)
+    stride = config.get("batch.stride", 1)
+    columns = {name: [] for name in COLUMNS}
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise Exception(f"Failed to open video file: {path}")
+    try:
+        first = start - warmup
+        if first > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+        index = first
+        while end is None or index < end:
+            # チャンクごとに間引くフレームがずれないよう、絶対フレーム番号で判定する
+            if index % stride != 0:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            results = processor.process_frame(frame, timestamp)
+            if index >= start:
+                for track_id, ((x, y, w, h), distance) in enumerate(results):
+                    columns["frame"].append(index)
+                    columns["timestamp"].append(timestamp)
+                    columns["track_id"].append(track_id)
+                    columns["x"].append(x)
+                    columns["y"].append(y)
+                    columns["w"].append(w)
+                    columns["h"].append(h)
+                    columns["distance"].append(np.nan if distance is None else distance)
+            index += 1
+    finally:
+        cap.release()
+
+    return {
+        "frame": np.asarray(columns["frame"], dtype=np.int64),
+        "timestamp": np.asarray(columns["timestamp"], dtype=np.float64),
+        "track_id": np.asarray(columns["track_id"], dtype=np.int32),
+        "x": np.asarray(columns["x"], dtype=np.float32),
+        "y": np.asarray(columns["y"], dtype=np.float32),
+        "w": np.asarray(columns["w"], dtype=np.float32),
+        "h": np.asarray(columns["h"], dtype=np.float32),
+        "distance": np.asarray(columns["distance"], dtype=np.float32),
+    }
+
+
+class BatchRunner:
+    def __init__(self, config, output_dir=None, workers=None):
+        self.config = config
+        self.output_dir = output_dir or config.get("batch.output_dir", os.path.join(os.getcwd(), "tmp", "batch"))
+        self.workers = workers or config.get("batch.workers") or os.cpu_count()
+        self.chunk_frames = config.get("batch.chunk_frames", 3000)
+        self.warmup_frames = config.get("batch.warmup_frames", 30)
+
+    def split_chunks(self, path):
+        cap = cv2.VideoCapture(path)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+        cap.release()
+        if frame_count <= 0:
+            return [(0, None, 0)]
+
+        chunks = []
+        for start in range(0, frame_count, self.chunk_frames):
+            end = min(frame_count, start + self.chunk_frames)
+            chunks.append((start, end, min(self.warmup_frames, start)))
+        return chunks
+
+    def output_path(self, path, root):
+        # 入力の共通ディレクトリからの相対パスを出力先に再現し、別ディレクトリの同名ファイルを区別する
+        relative = os.path.relpath(os.path.abspath(path), root)
+        return os.path.join(self.output_dir, os.path.splitext(relative)[0] + ".npz")
+
+    def output_paths(self, paths):
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+        outputs = {}
+        for path in paths:
+            output = self.output_path(path, root)
+            if output in outputs.values():
+                other = next(p for p, o in outputs.items() if o == output)
+                raise ValueError(f"Inputs {other} and {path} would both be written to {output}")
+            outputs[path] = output
+        return outputs
+
+    def run(self, inputs):
+        paths = expand_inputs(inputs)
+        if not paths:
+            print("No video files found.")
+            return []
+
+        outputs = self.output_paths(paths)
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {}
+            for path in paths:
+                futures[path] = [
+                    executor.submit(process_chunk, self.config.data, self.config.overrides, path, start, end, warmup)
+                    for start, end, warmup in self.split_chunks(path)
+                ]
+            print(f"Processing {len(paths)} files in {sum(len(f) for f in futures.values())} chunks "
+                  f"with {self.workers} workers.")
+
+            written = []
+            for path, chunk_futures in futures.items():
+                try:
+                    chunks = [future.result() for future in chunk_futures]
+                except Exception as e:
+                    print(f"Error processing {path}: {e}")
+                    continue
+                output = outputs[path]
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+                np.savez_compressed(output, **{
+                    name: np.concatenate([chunk[name] for chunk in chunks]) for name in COLUMNS
+                })
+                print(f"{path}: {sum(len(chunk['frame']) for chunk in chunks)} results -> {output}")
+                written.append(output)
+        return written
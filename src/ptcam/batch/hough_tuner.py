@@ -0,0 +1,184 @@
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+from ptcam.tracker.tracker import Tracker
+
+PARAM_NAMES = ("dp", "min_dist", "param1", "param2", "min_radius", "max_radius")
+
+# ワーカープロセスごとに一度だけ受け取る前処理済みフレームと正解
+_frames = None
+_labels = None
+
+
+def _init_worker(frames, labels):
+    global _frames, _labels
+    _frames = frames
+    _labels = labels
+
+
+def match_circles(detected, expected):
+    # 中心と半径が近いものを正解とみなし、貪欲に対応付ける
+    unmatched = list(expected)
+    true_positives = 0
+    for (x, y, r) in detected:
+        for i, (ex, ey, er) in enumerate(unmatched):
+            if (x - ex) ** 2 + (y - ey) ** 2 <= max(5.0, 0.25 * er) ** 2 and abs(r - er) <= max(3.0, 0.25 * er):
+                true_positives += 1
+                del unmatched[i]
+                break
+    return true_positives, len(detected) - true_positives, len(unmatched)
+
+
+def evaluate(hough_params):
+    true_positives = false_positives = false_negatives = 0
+    elapsed = 0.0
+    for gray, expected in zip(_frames, _labels):
+        start = time.perf_counter()
+        detected = Tracker.hough_circles(gray, hough_params)
+        elapsed += time.perf_counter() - start
+        tp, fp, fn = match_circles(detected, expected)
+        true_positives += tp
+        false_positives += fp
+        false_negatives += fn
+
+    precision = true_positives / (true_positives + false_positives) if true_positives + false_positives else 0.0
+    recall = true_positives / (true_positives + false_negatives) if true_positives + false_negatives else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        "params": hough_params,
+        "f1": f1,
+        "precision": precision,
+        "recall": recall,
+        "ms_per_call": elapsed * 1000 / max(1, len(_frames)),
+    }
+
+
+def pareto_front(trials):
+    # F1 が高く、1 回あたりの処理時間が短いものが優位
+    front = []
+    for trial in trials:
+        dominated = any(
+            other["f1"] >= trial["f1"] and other["ms_per_call"] <= trial["ms_per_call"]
+            and (other["f1"] > trial["f1"] or other["ms_per_call"] < trial["ms_per_call"])
+            for other in trials
+        )
+        if not dominated:
+            front.append(trial)
+    return sorted(front, key=lambda t: (-t["f1"], t["ms_per_call"]))
+
+
+def synthetic_frames(count, size, radius_range, seed):
+    rng = np.random.default_rng(seed)
+    width, height = size
+    frames, labels = [], []
+    for _ in range(count):
+        frame = rng.integers(40, 120, (height, width, 3), dtype=np.uint8)
+        frame = cv2.GaussianBlur(frame, (0, 0), 3)
+        circles = []
+        for _ in range(rng.integers(0, 4)):
+            r = int(rng.integers(radius_range[0], radius_range[1] + 1))
+            x = int(rng.integers(r, max(r + 1, width - r)))
+            y = int(rng.integers(r, max(r + 1, height - r)))
+            if any((x - cx) ** 2 + (y - cy) ** 2 < (r + cr) ** 2 for (cx, cy, cr) in circles):
+                continue
+            color = tuple(int(c) for c in rng.integers(150, 256, 3))
+            cv2.circle(frame, (x, y), r, color, -1)
+            circles.append((x, y, r))
+        noise = rng.normal(0, 8, frame.shape)
+        frames.append(np.clip(frame + noise, 0, 255).astype(np.uint8))
+        labels.append(circles)
+    return frames, labels
+
+
+def load_labeled_frames(labels_path):
+    # {"frame_000.png": [[x, y, r], ...], ...}（パスはラベルファイルからの相対パス）
+    with open(labels_path, "r") as file:
+        entries = json.load(file)
+    base_dir = os.path.dirname(os.path.abspath(labels_path))
+    frames, labels = [], []
+    for name, circles in entries.items():
+        frame = cv2.imread(os.path.join(base_dir, name))
+        if frame is None:
+            print(f"Warning: Could not read labeled frame: {name}")
+            continue
+        frames.append(frame)
+        labels.append([tuple(circle) for circle in circles])
+    return frames, labels
+
+
+class HoughTuner:
+    def __init__(self, config, workers=None):
+        self.config = config
+        self.workers = workers or config.get("tuning.workers") or os.cpu_count()
+        self.trials = config.get("tuning.trials", 200)
+        self.seed = config.get("tuning.seed", 0)
+
+    def search_space(self, labels):
+        radii = [r for circles in labels for (_, _, r) in circles]
+        if radii:
+            min_radius, max_radius = min(radii), max(radii)
+        else:
+            min_radius = self.config.get("hough_params.min_radius", 20)
+            max_radius = self.config.get("hough_params.max_radius", 100)
+        return {
+            "dp": (1.0, 2.5),
+            "min_dist": (max(1.0, min_radius * 0.5), max(2.0, max_radius * 4.0)),
+            "param1": (30, 250),
+            "param2": (10, 120),
+            "min_radius": (max(0, int(min_radius * 0.6)), max(1, int(min_radius))),
+            "max_radius": (int(max_radius), int(max_radius * 1.5) + 1),
+        }
+
+    def sample_params(self, space, rng):
+        params = {
+            "dp": round(rng.uniform(*space["dp"]), 2),
+            "min_dist": round(rng.uniform(*space["min_dist"]), 1),
+            "param1": rng.randint(*space["param1"]),
+            "param2": rng.randint(*space["param2"]),
+            "min_radius": rng.randint(*space["min_radius"]),
+            "max_radius": rng.randint(*space["max_radius"]),
+        }
+        return params
+
+    def current_params(self):
+        return {
+            "dp": self.config.get("hough_params.dp", 1.2),
+            "min_dist": self.config.get("hough_params.min_dist", 50),
+            "param1": self.config.get("hough_params.param1", 100),
+            "param2": self.config.get("hough_params.param2", 70),
+            "min_radius": self.config.get("hough_params.min_radius", 20),
+            "max_radius": self.config.get("hough_params.max_radius", 100),
+        }
+
+    def run(self, frames, labels):
+        # ぼかし済みグレースケールを一度だけ作り、各試行は HoughCircles のみを実行する
+        grays = [Tracker.preprocess(frame) for frame in frames]
+        rng = random.Random(self.seed)
+        space = self.search_space(labels)
+        candidates = [self.current_params()] + [self.sample_params(space, rng) for _ in range(self.trials)]
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(grays, labels)) as executor:
+            trials = list(executor.map(evaluate, candidates, chunksize=max(1, len(candidates) // (self.workers * 4))))
+
+        front = pareto_front(trials)
+        max_ms = self.config.get("tuning.max_ms_per_call")
+        eligible = [t for t in front if max_ms is None or t["ms_per_call"] <= max_ms] or front
+        return trials[0], front, eligible[0]
+
+    def apply(self, trial):
+        for name in PARAM_NAMES:
+            self.config.set(f"hough_params.{name}", trial["params"][name])
+        self.config.save()
+
+
+def load_frames(config, labels_path=None, synthetic=0):
+    if labels_path:
+        return load_labeled_frames(labels_path)
+    width, height = config.get("tuning.synthetic_size", [640, 480])
+    max_radius = min(config.get("hough_params.max_radius", 100), min(width, height) // 4)
+    min_radius = min(config.get("hough_params.min_radius", 20), max_radius)
+    return synthetic_frames(synthetic, (width, height), (min_radius, max_radius), config.get("tuning.seed", 0))
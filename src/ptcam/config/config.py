@@ -1,3 +1,4 @@
+import copy
 import yaml
 import os
 
@@ -18,7 +19,13 @@ DEFAULT_CONFIG = {
 CONFIG_FILE = "config.yaml"
 
 class Config:
-    def __init__(self):
+    def __init__(self, data=None, overrides=None):
+        # コマンドライン引数などその場限りの値。save() では書き出さない
+        self.overrides = dict(overrides) if overrides else {}
+        if data is not None:
+            # 別プロセスへ渡された設定などファイルを読まずに構築する場合
+            self.data = copy.deepcopy(data)
+            return
         self.data = DEFAULT_CONFIG.copy()
         self.load()
 
@@ -32,6 +39,8 @@ class Config:
             yaml.dump(self.data, file)
 
     def get(self, key, default=None):
+        if key in self.overrides:
+            return self.overrides[key]
         keys = key.split(".")
         value = self.data
         for k in keys:
@@ -40,7 +49,11 @@ class Config:
             value = value[k]
         return value
 
+    def override(self, key, value):
+        self.overrides[key] = value
+
     def set(self, key, value):
+        self.overrides.pop(key, None)
         keys = key.split(".")
         config = self.data
         for k in keys[:-1]:
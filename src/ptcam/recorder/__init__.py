@@ -0,0 +1,3 @@
+from .recorder import Recorder
+
+__all__ = ["Recorder"]
\ No newline at end of file
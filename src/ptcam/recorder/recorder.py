@@ -0,0 +1,177 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import cv2
+
+
+class Clip:
+    def __init__(self, frames, end_time):
+        self.frames = frames
+        self.end_time = end_time
+
+
+class Recorder:
+    def __init__(self, config, buffer_pool=None):
+        self.config = config
+        self.buffer_pool = buffer_pool
+        self.output_dir = config.get("screenshot_dir", os.path.join(os.getcwd(), "tmp"))
+        self.jpeg_quality = config.get("recorder.jpeg_quality", 90)
+        self.pre_roll = config.get("recorder.pre_roll_sec", 5.0)
+        self.post_roll = config.get("recorder.post_roll_sec", 5.0)
+        self.clip_on_track = config.get("recorder.clip_on_track", False)
+        self.fourcc = config.get("recorder.fourcc", "mp4v")
+        # プリロールはクリップ機能を使う場合だけ保持し、縮小したうえでバイト数で上限を設ける
+        self.pre_roll_enabled = config.get("recorder.pre_roll_enabled", False) or self.clip_on_track
+        self.clip_width = config.get("recorder.clip_width", 640)
+        self.max_buffer_bytes = int(config.get("recorder.max_buffer_mb", 64) * 1024 * 1024)
+        self.frames = deque()
+        self.buffer_bytes = 0
+        self.last_frame = None
+        self.clips = []
+        self.tracking = False
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=config.get("recorder.workers", 2), thread_name_prefix="recorder")
+
+    def add_frame(self, frame, results=None, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        finished = []
+        with self.lock:
+            # スナップショット用に最新フレームだけは常に保持する
+            if self.last_frame is not None:
+                self._release(self.last_frame)
+            self.last_frame = self._retain(frame)
+
+            stored = None
+            if self.pre_roll_enabled or self.clips:
+                stored = self._store(frame)
+            if self.pre_roll_enabled:
+                self.frames.append((timestamp, self._retain(stored)))
+                self.buffer_bytes += stored.nbytes
+                while self.frames and (self.frames[0][0] < timestamp - self.pre_roll
+                                       or self.buffer_bytes > self.max_buffer_bytes):
+                    self._drop_oldest()
+
+            for clip in self.clips:
+                clip.frames.append((timestamp, self._retain(stored)))
+                if timestamp >= clip.end_time:
+                    finished.append(clip)
+            self.clips = [clip for clip in self.clips if clip not in finished]
+
+        if stored is not None:
+            self._release(stored)
+        for clip in finished:
+            self._submit(self._write_clip, clip.frames)
+
+        if results is not None:
+            tracking = len(results) > 0
+            if tracking and not self.tracking and self.clip_on_track:
+                self.record_clip()
+            self.tracking = tracking
+
+    def snapshot(self, frame=None):
+        with self.lock:
+            if frame is None:
+                if self.last_frame is None:
+                    return None
+                frame = self.last_frame
+            self._retain(frame)
+        return self._submit(self._write_snapshot, frame)
+
+    def record_clip(self, post_roll=None):
+        post_roll = self.post_roll if post_roll is None else post_roll
+        with self.lock:
+            # 直近のフレームをプリロールとして引き継ぐ
+            self.clips.append(Clip([(t, self._retain(f)) for t, f in self.frames], time.time() + post_roll))
+
+    def stop(self):
+        with self.lock:
+            clips = self.clips
+            self.clips = []
+        for clip in clips:
+            self._submit(self._write_clip, clip.frames)
+        self.executor.shutdown(wait=True)
+        with self.lock:
+            while self.frames:
+                self._drop_oldest()
+            if self.last_frame is not None:
+                self._release(self.last_frame)
+                self.last_frame = None
+
+    def _submit(self, fn, *args):
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future):
+        error = future.exception()
+        if error is not None:
+            print(f"Error: Recorder failed to write output: {error!r}")
+
+    def _store(self, frame):
+        # クリップ用のフレームは clip_width まで縮小したコピーを保持する（0 ならフル解像度のまま）
+        height, width = frame.shape[:2]
+        if self.clip_width and width > self.clip_width:
+            scale = self.clip_width / width
+            return cv2.resize(frame, (self.clip_width, max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+        return self._retain(frame)
+
+    def _drop_oldest(self):
+        _, frame = self.frames.popleft()
+        self.buffer_bytes -= frame.nbytes
+        self._release(frame)
+
+    def _retain(self, frame):
+        if self.buffer_pool is not None:
+            self.buffer_pool.retain(frame)
+        return frame
+
+    def _release(self, frame):
+        if self.buffer_pool is not None:
+            self.buffer_pool.release(frame)
+
+    def _output_path(self, prefix, extension):
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.{extension}"
+        return os.path.join(self.output_dir, name)
+
+    def _write_snapshot(self, frame):
+        try:
+            path = self._output_path("snapshot", "jpg")
+            if not cv2.imwrite(path, frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]):
+                print(f"Warning: Could not write snapshot: {path}")
+                return None
+            return path
+        finally:
+            self._release(frame)
+
+    def _write_clip(self, frames):
+        try:
+            return self._encode_clip(frames)
+        finally:
+            for _, frame in frames:
+                self._release(frame)
+
+    def _encode_clip(self, frames):
+        if not frames:
+            return None
+        duration = frames[-1][0] - frames[0][0]
+        fps = (len(frames) - 1) / duration if duration > 0 else self.config.get("recorder.fps", 30.0)
+        # 端数のある fps はコーデックによって拒否されるため整数に丸める
+        fps = max(1, round(fps))
+        height, width = frames[0][1].shape[:2]
+        path = self._output_path("clip", "mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), fps, (width, height))
+        if not writer.isOpened():
+            print(f"Warning: Could not open video writer: {path}")
+            return None
+        try:
+            for _, frame in frames:
+                if frame.shape[:2] == (height, width):
+                    writer.write(frame)
+        finally:
+            writer.release()
+        return path
@@ -0,0 +1,3 @@
+from .result_sink import ResultSink, TextSink, NDJSONSink, BinarySink, UnixSocketSink, create_sink
+
+__all__ = ["ResultSink", "TextSink", "NDJSONSink", "BinarySink", "UnixSocketSink", "create_sink"]
\ No newline at end of file
@@ -0,0 +1,207 @@
+import json
+import math
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+
+# frame_index, timestamp, track_id, x, y, w, h, distance (未計測は NaN)
+RECORD_STRUCT = struct.Struct("<QdI5f")
+
+
+class ResultSink:
+    def __init__(self, config):
+        self.config = config
+        self.batch_size = config.get("output.batch_size", 256)
+        self.flush_interval = config.get("output.flush_interval_sec", 0.1)
+        self.queue = queue.Queue(maxsize=config.get("output.queue_size", 10000))
+        self.dropped = 0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread and self.thread.is_alive():
+            self.thread.join()
+        self.close()
+
+    def write(self, frame_index, timestamp, results):
+        # 処理スレッドはキューに積むだけで、書き込みは待たない
+        for track_id, ((x, y, w, h), distance) in enumerate(results):
+            record = (frame_index, timestamp, track_id, float(x), float(y), float(w), float(h), distance)
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+
+    def _write_loop(self):
+        while self.running or not self.queue.empty():
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                self.idle()
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self.write_batch(batch)
+
+    def idle(self):
+        pass
+
+    @property
+    def writes_stdout(self):
+        # 機械可読な出力を標準出力に書く場合は True
+        return False
+
+    def write_batch(self, records):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class TextSink(ResultSink):
+    def __init__(self, config, stream=None):
+        super().__init__(config)
+        self.stream = stream or sys.stdout
+
+    def write_batch(self, records):
+        lines = []
+        for frame_index, timestamp, track_id, x, y, w, h, distance in records:
+            if distance is not None:
+                lines.append(f"Object {track_id}: Box=({x}, {y}, {w}, {h}), Distance={distance:.2f} mm\n")
+            else:
+                lines.append(f"Object {track_id}: Box=({x}, {y}, {w}, {h}), Distance=N/A\n")
+        self.stream.write("".join(lines))
+        self.stream.flush()
+
+
+class NDJSONSink(ResultSink):
+    def __init__(self, config, path=None):
+        super().__init__(config)
+        self.owns_file = path is not None
+        self.file = open(path, "a", encoding="utf-8") if path else sys.stdout
+
+    def write_batch(self, records):
+        lines = []
+        for frame_index, timestamp, track_id, x, y, w, h, distance in records:
+            lines.append(json.dumps({
+                "frame": frame_index,
+                "timestamp": timestamp,
+                "track_id": track_id,
+                "box": [x, y, w, h],
+                "distance_mm": distance,
+            }, separators=(",", ":")) + "\n")
+        self.file.write("".join(lines))
+        self.file.flush()
+
+    @property
+    def writes_stdout(self):
+        return not self.owns_file
+
+    def close(self):
+        if self.owns_file:
+            self.file.close()
+
+
+def pack_records(records):
+    buffer = bytearray(RECORD_STRUCT.size * len(records))
+    for i, (frame_index, timestamp, track_id, x, y, w, h, distance) in enumerate(records):
+        RECORD_STRUCT.pack_into(
+            buffer, i * RECORD_STRUCT.size,
+            frame_index, timestamp, track_id, x, y, w, h,
+            math.nan if distance is None else distance,
+        )
+    return bytes(buffer)
+
+
+def unpack_records(data):
+    records = []
+    for frame_index, timestamp, track_id, x, y, w, h, distance in RECORD_STRUCT.iter_unpack(data):
+        records.append((frame_index, timestamp, track_id, x, y, w, h, None if math.isnan(distance) else distance))
+    return records
+
+
+class BinarySink(ResultSink):
+    def __init__(self, config, path):
+        super().__init__(config)
+        self.file = open(path, "ab")
+
+    def write_batch(self, records):
+        self.file.write(pack_records(records))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class UnixSocketSink(ResultSink):
+    def __init__(self, config, path):
+        super().__init__(config)
+        self.path = path
+        self.clients = []
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(path)
+        self.server.listen()
+        self.server.setblocking(False)
+
+    def accept_clients(self):
+        while True:
+            try:
+                client, _ = self.server.accept()
+            except BlockingIOError:
+                return
+            client.settimeout(self.config.get("output.send_timeout_sec", 0.05))
+            self.clients.append(client)
+
+    def idle(self):
+        self.accept_clients()
+
+    def write_batch(self, records):
+        self.accept_clients()
+        if not self.clients:
+            return
+        data = pack_records(records)
+        for client in list(self.clients):
+            try:
+                client.sendall(data)
+            except OSError:
+                # 受信が追いつかないクライアントは切断する
+                self.clients.remove(client)
+                client.close()
+
+    def close(self):
+        for client in self.clients:
+            client.close()
+        self.clients = []
+        self.server.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def create_sink(config):
+    output_format = config.get("output.format", "text")
+    path = config.get("output.path")
+    if output_format == "text":
+        return TextSink(config)
+    if output_format == "ndjson":
+        return NDJSONSink(config, path)
+    if output_format == "binary":
+        if not path:
+            raise ValueError("output.path is required for binary output")
+        return BinarySink(config, path)
+    if output_format == "socket":
+        return UnixSocketSink(config, path or os.path.join(os.getcwd(), "tmp", "ptcam.sock"))
+    raise ValueError(f"Invalid output format: {output_format}")
@@ -0,0 +1,4 @@
+from .annotator import draw_results
+from .mjpeg_server import MJPEGServer
+
+__all__ = ["draw_results", "MJPEGServer"]
\ No newline at end of file
@@ -0,0 +1,11 @@
+import cv2
+
+
+def draw_results(frame, results, scale=1.0):
+    for i, ((x, y, w, h), distance) in enumerate(results):
+        x, y, w, h = x * scale, y * scale, w * scale, h * scale
+        cv2.rectangle(frame, (int(x), int(y)), (int(x + w), int(y + h)), (0, 0, 255), 2)
+        label_text = f"Tracker{i}: {distance:.2f} mm" if distance is not None else f"Tracker{i}: Distance N/A"
+        cv2.putText(frame, label_text, (int(x), int(y) - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+    return frame
\ No newline at end of file
@@ -0,0 +1,135 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import cv2
+from ptcam.stream.annotator import draw_results
+
+BOUNDARY = "ptcamframe"
+
+
+class MJPEGServer:
+    def __init__(self, config, buffer_pool=None):
+        self.config = config
+        self.buffer_pool = buffer_pool
+        self.host = config.get("stream.host", "0.0.0.0")
+        self.port = config.get("stream.port", 8080)
+        self.width = config.get("stream.width", 640)
+        self.jpeg_quality = config.get("stream.jpeg_quality", 70)
+        self.condition = threading.Condition()
+        self.pending = None
+        self.jpeg = None
+        self.sequence = 0
+        self.clients = 0
+        self.running = False
+        self.httpd = None
+
+    def start(self):
+        self.running = True
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.encoder_thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self.encoder_thread.start()
+        print(f"MJPEG stream available at http://{self.host}:{self.port}/stream.mjpg")
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            if self.pending is not None:
+                # エンコード待ちのまま残ったフレームを返す
+                if self.buffer_pool is not None:
+                    self.buffer_pool.release(self.pending[0])
+                self.pending = None
+            self.condition.notify_all()
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def publish(self, frame, results):
+        # 最新フレームだけを保持し、エンコードは別スレッドで行う
+        with self.condition:
+            if self.clients == 0:
+                return
+            if self.buffer_pool is not None:
+                self.buffer_pool.retain(frame)
+                if self.pending is not None:
+                    # エンコードが追いつかず置き換えられたフレームを返す
+                    self.buffer_pool.release(self.pending[0])
+            self.pending = (frame, results)
+            self.condition.notify_all()
+
+    def _encode_loop(self):
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                frame, results = self.pending
+                self.pending = None
+
+            source = frame
+            height, width = frame.shape[:2]
+            scale = min(1.0, self.width / width)
+            if scale < 1.0:
+                frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+            else:
+                frame = frame.copy()
+            if self.buffer_pool is not None:
+                self.buffer_pool.release(source)
+            draw_results(frame, results, scale)
+            ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not ok:
+                continue
+
+            with self.condition:
+                self.jpeg = encoded.tobytes()
+                self.sequence += 1
+                self.condition.notify_all()
+
+    def wait_for_frame(self, last_sequence):
+        # 遅いクライアントは途中のフレームを飛ばして最新フレームを受け取る
+        with self.condition:
+            while self.running and self.sequence == last_sequence:
+                self.condition.wait()
+            if not self.running:
+                return None, last_sequence
+            return self.jpeg, self.sequence
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/stream.mjpg"):
+                    self.send_error(404)
+                    return
+
+                self.send_response(200)
+                self.send_header("Cache-Control", "no-cache, private")
+                self.send_header("Pragma", "no-cache")
+                self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+                self.end_headers()
+
+                with server.condition:
+                    server.clients += 1
+                try:
+                    sequence = 0
+                    while True:
+                        jpeg, sequence = server.wait_for_frame(sequence)
+                        if jpeg is None:
+                            return
+                        self.wfile.write(
+                            f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode()
+                        )
+                        self.wfile.write(jpeg)
+                        self.wfile.write(b"\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    with server.condition:
+                        server.clients -= 1
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -1,7 +1,17 @@
 from .tracker import Tracker
 from .distance_calculator import DistanceCalculator
-from .gui_tracker_runner import GUITrackerRunner
+from .motion_detector import MotionDetector
+from .trajectory_store import Trajectory, TrajectoryStore
 from .tracker_processor import TrackerProcessor
 from .cli_tracker_runner import CLITrackerRunner
 
-__all__ = ["Tracker", "DistanceCalculator", "GUITrackerRunner", "TrackerProcessor", "CLITrackerRunner"]
\ No newline at end of file
+
+def __getattr__(name):
+    # GUITrackerRunner は PyQt5 に依存するため、参照されたときに読み込む（import * の対象外）
+    if name == "GUITrackerRunner":
+        from .gui_tracker_runner import GUITrackerRunner
+        return GUITrackerRunner
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["Tracker", "DistanceCalculator", "MotionDetector", "Trajectory", "TrajectoryStore", "TrackerProcessor", "CLITrackerRunner"]
\ No newline at end of file
@@ -0,0 +1,81 @@
+import threading
+import numpy as np
+
+
+class BufferPool:
+    def __init__(self, config):
+        self.max_free = config.get("buffer_pool.max_free", 8)
+        self.max_scratch = config.get("buffer_pool.max_scratch", 32)
+        self.free = {}
+        self.leases = {}
+        self.scratch_buffers = {}
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "scratch_hits": 0, "scratch_misses": 0, "returned": 0, "discarded": 0}
+
+    def acquire(self, shape, dtype=np.uint8):
+        # 参照カウント 1 で貸し出す。全ての利用者が release() すると再利用される
+        key = (tuple(shape), np.dtype(dtype))
+        with self.lock:
+            buffers = self.free.get(key)
+            if buffers:
+                array = buffers.pop()
+                self.counters["hits"] += 1
+            else:
+                array = np.empty(key[0], dtype=key[1])
+                self.counters["misses"] += 1
+            self.leases[id(array)] = [array, 1]
+        return array
+
+    def adopt(self, array):
+        # プール外で確保された配列を管理下に置く
+        with self.lock:
+            if id(array) not in self.leases:
+                self.counters["misses"] += 1
+                self.leases[id(array)] = [array, 1]
+        return array
+
+    def retain(self, array):
+        with self.lock:
+            lease = self.leases.get(id(array))
+            if lease is not None and lease[0] is array:
+                lease[1] += 1
+        return array
+
+    def release(self, array):
+        with self.lock:
+            lease = self.leases.get(id(array))
+            if lease is None or lease[0] is not array:
+                return
+            lease[1] -= 1
+            if lease[1] > 0:
+                return
+            del self.leases[id(array)]
+            buffers = self.free.setdefault((array.shape, array.dtype), [])
+            if len(buffers) < self.max_free:
+                buffers.append(array)
+                self.counters["returned"] += 1
+            else:
+                self.counters["discarded"] += 1
+
+    def scratch(self, name, shape, dtype=np.uint8):
+        # 同じスレッドの処理内だけで使う作業用バッファ（解像度ごとに再利用する）
+        key = (name, tuple(shape), np.dtype(dtype))
+        with self.lock:
+            array = self.scratch_buffers.get(key)
+            if array is not None:
+                self.counters["scratch_hits"] += 1
+                return array
+            if len(self.scratch_buffers) >= self.max_scratch:
+                self.scratch_buffers.clear()
+            array = self.scratch_buffers[key] = np.empty(key[1], dtype=key[2])
+            self.counters["scratch_misses"] += 1
+            return array
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["outstanding"] = len(self.leases)
+            stats["free"] = sum(len(buffers) for buffers in self.free.values())
+        requests = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / requests if requests else 0.0
+        return stats
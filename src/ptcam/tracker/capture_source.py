@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+import cv2
+from ptcam.tracker.latency_tracer import FrameInfo
+
+CONNECTING = "connecting"
+CONNECTED = "connected"
+RECONNECTING = "reconnecting"
+CLOSED = "closed"
+
+
+class CaptureSource:
+    def __init__(self, config, tracer=None, pool=None):
+        self.tracer = tracer
+        self.pool = pool
+        self.frame_shape = None
+        self.url = config.get("rtsp_url")
+        # ローカルの録画ファイルは末尾に達したら終了し、再接続しない
+        self.finite = isinstance(self.url, str) and os.path.isfile(self.url)
+        self.open_timeout = config.get("capture.open_timeout_sec", 5.0)
+        self.read_timeout = config.get("capture.read_timeout_sec", 5.0)
+        self.stall_timeout = config.get("capture.stall_timeout_sec", 3.0)
+        self.max_read_failures = config.get("capture.max_read_failures", 5)
+        self.backoff_initial = config.get("capture.backoff_initial_sec", 0.5)
+        self.backoff_max = config.get("capture.backoff_max_sec", 30.0)
+        self.backoff_delay = self.backoff_initial
+        self.stall_reference = None
+        self.opened_once = False
+        self.cap = None
+        self.state = CLOSED
+        self.listeners = []
+        self.stop_event = threading.Event()
+        self.metrics = {
+            "frames": 0,
+            "read_failures": 0,
+            "reconnects": 0,
+            "last_frame_time": None,
+            "last_outage_sec": 0.0,
+        }
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def read(self):
+        # フレームが得られるまで再接続を繰り返し、停止された場合とファイルの末尾に達した場合のみ (False, None, None) を返す
+        failures = 0
+        while not self.stop_event.is_set():
+            if self.cap is None and not self._reconnect():
+                continue
+
+            start = time.monotonic()
+            ret, frame = self._read_into_pool()
+            now = time.monotonic()
+            if ret:
+                if self.state != CONNECTED:
+                    self._set_state(CONNECTED)
+                self.metrics["frames"] += 1
+                self.metrics["last_frame_time"] = now
+                self.stall_reference = now
+                # 実際にフレームが届いた時点で初めてバックオフを戻す
+                self.backoff_delay = self.backoff_initial
+                info = FrameInfo(self.metrics["frames"], self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0, now, time.time())
+                if self.tracer:
+                    self.tracer.add_span("decode", start, now, info)
+                return True, frame, info
+
+            if self.finite:
+                break
+
+            failures += 1
+            self.metrics["read_failures"] += 1
+            stalled = self.stall_reference is not None and now - self.stall_reference > self.stall_timeout
+            if failures >= self.max_read_failures or stalled:
+                self._release()
+                failures = 0
+            else:
+                self.stop_event.wait(0.01)
+        return False, None, None
+
+    def _read_into_pool(self):
+        # 直前のフレームと同じ解像度のバッファをプールから借りて、そこへデコードする
+        if self.pool is None:
+            return self.cap.read()
+        buffer = self.pool.acquire(self.frame_shape) if self.frame_shape else None
+        ret, frame = self.cap.read(buffer) if buffer is not None else self.cap.read()
+        if buffer is not None and (not ret or frame is not buffer):
+            self.pool.release(buffer)
+        if ret and frame is not buffer:
+            self.frame_shape = frame.shape
+            self.pool.adopt(frame)
+        return ret, frame
+
+    def stop(self):
+        # read() を実行中のスレッドから抜けさせる。解放は close() で行う
+        self.stop_event.set()
+
+    def close(self):
+        self._release()
+        self._set_state(CLOSED)
+
+    def _open(self):
+        params = [
+            cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, int(self.open_timeout * 1000),
+            cv2.CAP_PROP_READ_TIMEOUT_MSEC, int(self.read_timeout * 1000),
+        ]
+        cap = cv2.VideoCapture(self.url, cv2.CAP_ANY, params)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        return cap
+
+    def _reconnect(self):
+        self._set_state(CONNECTING if self.metrics["last_frame_time"] is None else RECONNECTING)
+        outage_start = time.monotonic()
+        while not self.stop_event.is_set():
+            # 初回以外の再オープン（読み取り失敗によるものも含む）は必ずバックオフを待つ
+            if self.opened_once:
+                if self.stop_event.wait(self.backoff_delay):
+                    return False
+                self.backoff_delay = min(self.backoff_max, self.backoff_delay * 2)
+            self.opened_once = True
+
+            self.cap = self._open()
+            if self.cap is not None:
+                self.stall_reference = time.monotonic()
+                if self.metrics["last_frame_time"] is not None:
+                    self.metrics["reconnects"] += 1
+                    self.metrics["last_outage_sec"] = time.monotonic() - self.metrics["last_frame_time"]
+                return True
+            print(f"Failed to open RTSP stream: {self.url}, retrying in {self.backoff_delay:.1f}s "
+                  f"(down {time.monotonic() - outage_start:.1f}s)")
+        return False
+
+    def _release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        self.state = state
+        for listener in self.listeners:
+            listener(state, dict(self.metrics))
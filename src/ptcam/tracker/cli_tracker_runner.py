@@ -1,33 +1,68 @@
+import contextlib
+import sys
+import time
+from ptcam.recorder.recorder import Recorder
+from ptcam.sink.result_sink import create_sink
+from ptcam.stream.mjpeg_server import MJPEGServer
+from ptcam.tracker.buffer_pool import BufferPool
 from ptcam.tracker.frame_reader import FrameReader
+from ptcam.tracker.latency_tracer import LatencyTracer
 from ptcam.tracker.tracker_processor import TrackerProcessor
 
 
 class CLITrackerRunner:
     def __init__(self, config):
         self.config = config
-        self.processor = TrackerProcessor(config)
-        self.frame_reader = FrameReader(config)
+        self.tracer = LatencyTracer(config)
+        self.pool = BufferPool(config)
+        self.processor = TrackerProcessor(config, self.tracer, self.pool)
+        self.frame_reader = FrameReader(config, self.tracer, self.pool)
+        self.sink = create_sink(config)
+        self.recorder = Recorder(config, self.pool)
+        self.stream_server = MJPEGServer(config, self.pool) if config.get("stream.enabled", False) else None
+        self.frame_reader.source.add_listener(self.on_capture_state)
+        self.frame_reader.source.add_listener(self.processor.on_capture_state)
 
     def start(self):
+        # 結果を標準出力へ流す場合、状態表示などのメッセージは標準エラー出力へ回す
+        if self.sink.writes_stdout:
+            with contextlib.redirect_stdout(sys.stderr):
+                self.run()
+        else:
+            self.run()
+
+    def run(self):
+        self.sink.start()
+        if self.stream_server:
+            self.stream_server.start()
         self.frame_reader.set_callback(self.process_frame)
         self.frame_reader.start()
         print("Starting tracking in CLI mode. Press Ctrl+C to stop.")
 
         try:
             while self.frame_reader.running:
-                pass  # メインスレッドはここで待機
+                time.sleep(0.1)  # メインスレッドはここで待機
         except KeyboardInterrupt:
             print("Stopping tracking...")
         finally:
             self.frame_reader.stop()
+            self.sink.stop()
+            self.recorder.stop()
+            if self.stream_server:
+                self.stream_server.stop()
+            self.tracer.dump()
+            print(f"Buffer pool: {self.pool.stats()}")
+            if self.sink.dropped:
+                print(f"Dropped {self.sink.dropped} results because the output queue was full.")
 
-    def process_frame(self, frame):
-        results = self.processor.process_frame(frame)
-        self.print_results(results)
+    def on_capture_state(self, state, metrics):
+        print(f"Capture {state}: frames={metrics['frames']}, reconnects={metrics['reconnects']}")
 
-    def print_results(self, results):
-        for i, ((x, y, w, h), distance) in enumerate(results):
-            if distance is not None:
-                print(f"Object {i}: Box=({x}, {y}, {w}, {h}), Distance={distance:.2f} mm")
-            else:
-                print(f"Object {i}: Box=({x}, {y}, {w}, {h}), Distance=N/A")
\ No newline at end of file
+    def process_frame(self, frame, frame_info):
+        timestamp = frame_info.wall_time
+        results = self.processor.process_frame(frame, timestamp, frame_info)
+        self.recorder.add_frame(frame, results, timestamp)
+        if self.stream_server:
+            self.stream_server.publish(frame, results)
+        self.sink.write(frame_info.index, timestamp, results)
+        self.tracer.complete(frame_info)
\ No newline at end of file
@@ -1,53 +1,53 @@
-import cv2
 import threading
 from typing import Callable
+from ptcam.tracker.capture_source import CaptureSource
+from ptcam.tracker.latency_tracer import FrameInfo
 
 
 class FrameReader:
-    def __init__(self, config):
-        self.rtsp_url = config.get("rtsp_url")
+    def __init__(self, config, tracer=None, pool=None):
         self.skip_frames = config.get("skip_frames", 0)
-        self.cap = None
+        self.pool = pool
+        self.source = CaptureSource(config, tracer, pool)
         self.running = False
         self.frame_counter = 0
         self.callback = None
+        self.thread = None
         self.lock = threading.Lock()
 
     def start(self):
         self.running = True
-        self.cap = cv2.VideoCapture(self.rtsp_url)
-        if not self.cap.isOpened():
-            raise Exception(f"Failed to open RTSP stream: {self.rtsp_url}")
-
         self.thread = threading.Thread(target=self._read_frames, daemon=True)
         self.thread.start()
 
     def stop(self):
         self.running = False
-        if self.thread.is_alive():
+        self.source.stop()
+        if self.thread and self.thread.is_alive():
             self.thread.join()
-        if self.cap:
-            self.cap.release()
+        self.source.close()
 
-    def set_callback(self, callback: Callable[[any], None]):
+    def set_callback(self, callback: Callable[[any, FrameInfo], None]):
         with self.lock:
             self.callback = callback
             
     def _read_frames(self):
         while self.running:
-            ret, frame = self.cap.read()
+            ret, frame, info = self.source.read()
             if not ret:
-                continue
+                self.running = False
+                break
 
             self.frame_counter += 1
 
-            if self.frame_counter <= self.skip_frames:
-                continue
-
-            self.frame_counter = 0
-            self._trigger_callback(frame)
+            if self.frame_counter > self.skip_frames:
+                self.frame_counter = 0
+                self._trigger_callback(frame, info)
+            # フレームを保持し続ける利用者は retain() しているので、ここで読み取り側の参照を返す
+            if self.pool is not None:
+                self.pool.release(frame)
 
-    def _trigger_callback(self, frame):
+    def _trigger_callback(self, frame, info):
         with self.lock:
             if self.callback:
-                self.callback(frame)
\ No newline at end of file
+                self.callback(frame, info)
\ No newline at end of file
@@ -1,20 +1,34 @@
 from PyQt5.QtCore import QObject, QThread, pyqtSignal
-import cv2
+from ptcam.recorder.recorder import Recorder
+from ptcam.stream.mjpeg_server import MJPEGServer
+from ptcam.tracker.buffer_pool import BufferPool
+from ptcam.tracker.capture_source import CaptureSource
+from ptcam.tracker.latency_tracer import LatencyTracer
 from ptcam.tracker.tracker_processor import TrackerProcessor
 
 
 class GUITrackerRunner(QObject):
-    frame_processed = pyqtSignal(object, list)
+    frame_processed = pyqtSignal(object, list, object)
     error_signal = pyqtSignal(str)
+    capture_state_changed = pyqtSignal(str, dict)
 
     def __init__(self, config):
         super().__init__()
         self.config = config
-        self.processor = TrackerProcessor(config)
+        self.tracer = LatencyTracer(config)
+        self.pool = BufferPool(config)
+        self.processor = TrackerProcessor(config, self.tracer, self.pool)
+        self.recorder = Recorder(config, self.pool)
+        self.stream_server = MJPEGServer(config, self.pool) if config.get("stream.enabled", False) else None
+        self.source = CaptureSource(config, self.tracer, self.pool)
+        self.source.add_listener(self.on_capture_state)
+        self.source.add_listener(self.processor.on_capture_state)
         self.running = False
 
     def start_tracking(self):
         self.running = True
+        if self.stream_server:
+            self.stream_server.start()
         self.thread = QThread()
         self.moveToThread(self.thread)
         self.thread.started.connect(self.run)
@@ -22,27 +36,37 @@ class GUITrackerRunner(QObject):
 
     def stop_tracking(self):
         self.running = False
+        self.source.stop()
         if hasattr(self, 'thread'):
             self.thread.quit()
             self.thread.wait()
+        self.recorder.stop()
+        if self.stream_server:
+            self.stream_server.stop()
+        self.tracer.dump()
 
     def run(self):
         try:
-            cap = cv2.VideoCapture(self.config.get("rtsp_url"))
-            if not cap.isOpened():
-                raise Exception(f"Failed to open RTSP stream: {self.config.get('rtsp_url')}")
-
             while self.running:
-                ret, frame = cap.read()
+                ret, frame, frame_info = self.source.read()
                 if not ret:
-                    continue
-
-                results = self.processor.process_frame(frame)
-                self.frame_processed.emit(frame, results)
+                    break
 
-            cap.release()
+                results = self.processor.process_frame(frame, frame_info.wall_time, frame_info)
+                self.recorder.add_frame(frame, results, frame_info.wall_time)
+                if self.stream_server:
+                    self.stream_server.publish(frame, results)
+                # 表示側が描画後に release() する
+                self.pool.retain(frame)
+                self.frame_processed.emit(frame, results, frame_info)
+                self.pool.release(frame)
         except Exception as e:
             self.error_signal.emit(str(e))
+        finally:
+            self.source.close()
+
+    def on_capture_state(self, state, metrics):
+        self.capture_state_changed.emit(state, metrics)
 
     def reset_trackers(self):
         try:
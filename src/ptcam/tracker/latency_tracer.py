@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager, nullcontext
+
+# index: 取得順の連番, pts: ストリーム上の時刻 (秒), arrival: 取得時の time.monotonic(), wall_time: 取得時の time.time()
+FrameInfo = namedtuple("FrameInfo", ["index", "pts", "arrival", "wall_time"])
+
+
+class LatencyTracer:
+    def __init__(self, config):
+        self.enabled = config.get("tracing.enabled", False)
+        self.output = config.get("tracing.output", os.path.join(os.getcwd(), "tmp", "trace.json"))
+        self.events = deque(maxlen=config.get("tracing.max_events", 100000))
+        self.thread_names = {}
+        self.lock = threading.Lock()
+
+    def span(self, name, frame_info=None):
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name, frame_info)
+
+    @contextmanager
+    def _span(self, name, frame_info):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.monotonic(), frame_info)
+
+    def add_span(self, name, start, end, frame_info=None):
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        args = {}
+        if frame_info is not None:
+            args = {"frame": frame_info.index, "pts": frame_info.pts, "age_ms": (end - frame_info.arrival) * 1000}
+        with self.lock:
+            self.thread_names.setdefault(thread.ident, thread.name)
+            self.events.append((name, start, end, thread.ident, args))
+
+    def complete(self, frame_info, name="frame"):
+        # 取得から現在までのフレーム全体のレイテンシ
+        if frame_info is not None:
+            self.add_span(name, frame_info.arrival, time.monotonic(), frame_info)
+
+    def to_chrome_trace(self):
+        pid = os.getpid()
+        with self.lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+
+        trace_events = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in thread_names.items()
+        ]
+        for name, start, end, tid, args in events:
+            trace_events.append({
+                "name": name,
+                "cat": "ptcam",
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def dump(self, path=None):
+        if not self.enabled:
+            return None
+        path = path or self.output
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(self.to_chrome_trace(), file)
+        print(f"Trace written to {path}")
+        return path
@@ -0,0 +1,55 @@
+import math
+import cv2
+import numpy as np
+
+
+class MotionDetector:
+    def __init__(self, config, pool=None):
+        self.config = config
+        self.pool = pool
+        self.scale_width = config.get("motion_gate.scale_width", 160)
+        self.threshold = config.get("motion_gate.threshold", 25)
+        self.min_area = config.get("motion_gate.min_area", 20)
+        self.learning_rate = config.get("motion_gate.learning_rate", 0.05)
+        self.background = None
+
+    def detect(self, frame):
+        # 変化領域をフル解像度座標の (x, y, w, h) で返す
+        height, width = frame.shape[:2]
+        scale = min(1.0, self.scale_width / width)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        small = gray = None
+        if self.pool is not None:
+            small = self.pool.scratch("motion_small", (size[1], size[0], 3))
+            gray = self.pool.scratch("motion_gray", (size[1], size[0]))
+        small = cv2.resize(frame, size, dst=small, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=gray)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+        if self.background is None or self.background.shape != gray.shape:
+            # 背景モデルが無い場合はフレーム全体を変化領域とみなす
+            self.background = gray.astype(np.float32)
+            return [(0, 0, width, height)]
+
+        diff = cv2.absdiff(gray, cv2.convertScaleAbs(self.background))
+        cv2.accumulateWeighted(gray, self.background, self.learning_rate)
+
+        _, mask = cv2.threshold(diff, self.threshold, 255, cv2.THRESH_BINARY)
+        mask = cv2.dilate(mask, None, iterations=2)
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+        regions = []
+        for contour in contours:
+            if cv2.contourArea(contour) < self.min_area:
+                continue
+            x, y, w, h = cv2.boundingRect(contour)
+            regions.append((
+                int(x / scale),
+                int(y / scale),
+                min(width, math.ceil(w / scale)),
+                min(height, math.ceil(h / scale)),
+            ))
+        return regions
+
+    def reset(self):
+        self.background = None
@@ -3,23 +3,64 @@ import numpy as np
 
 
 class Tracker:
-    def __init__(self, config):
+    def __init__(self, config, pool=None):
         self.config = config
+        self.pool = pool
+        self.scale = config.get("processing_scale", 1.0)
         self.trackers = cv2.legacy.MultiTracker_create()
 
-    def detect_circles_in_frame(self, frame):
-        hough_params = {
+    def get_hough_params(self):
+        # 距離・半径はフル解像度のピクセル数で設定されているため処理解像度に合わせる
+        # 投票数 (param2) も円周の長さに比例して減るため同じ倍率で下げ、min_param2 を下限とする
+        param2 = self.config.get("hough_params.param2", 70)
+        if self.scale < 1.0:
+            param2 = max(self.config.get("hough_params.min_param2", 10), int(round(param2 * self.scale)))
+        return {
             "dp": self.config.get("hough_params.dp", 1.2),
-            "min_dist": self.config.get("hough_params.min_dist", 50),
+            "min_dist": self.config.get("hough_params.min_dist", 50) * self.scale,
             "param1": self.config.get("hough_params.param1", 100),
-            "param2": self.config.get("hough_params.param2", 70),
-            "min_radius": self.config.get("hough_params.min_radius", 20),
-            "max_radius": self.config.get("hough_params.max_radius", 100),
+            "param2": param2,
+            "min_radius": int(round(self.config.get("hough_params.min_radius", 20) * self.scale)),
+            "max_radius": int(round(self.config.get("hough_params.max_radius", 100) * self.scale)),
         }
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (9, 9), 2)
+    def detect_circles_in_frame(self, frame, regions=None):
+        hough_params = self.get_hough_params()
+        if regions is None:
+            return self._detect_circles(frame, hough_params, scratch=True)
 
+        # 変化領域の周囲（最大半径分）だけを探索する
+        h, w = frame.shape[:2]
+        margin = int(hough_params["max_radius"])
+        results = []
+        for (rx, ry, rw, rh) in regions:
+            x0 = max(0, rx - margin)
+            y0 = max(0, ry - margin)
+            x1 = min(w, rx + rw + margin)
+            y1 = min(h, ry + rh + margin)
+            if x1 <= x0 or y1 <= y0:
+                continue
+            for (cx, cy, r) in self._detect_circles(frame[y0:y1, x0:x1], hough_params):
+                cx, cy = cx + x0, cy + y0
+                if all((cx - px) ** 2 + (cy - py) ** 2 >= hough_params["min_dist"] ** 2 for (px, py, _) in results):
+                    results.append((cx, cy, r))
+        return results
+
+    def _detect_circles(self, frame, hough_params, scratch=False):
+        # フル解像度の探索では作業用バッファを使い回す（領域ごとの探索はサイズが変わるため除く）
+        if scratch and self.pool is not None:
+            gray = self.pool.scratch("gray", frame.shape[:2])
+            blurred = self.pool.scratch("blurred", frame.shape[:2])
+            return self.hough_circles(self.preprocess(frame, gray, blurred), hough_params)
+        return self.hough_circles(self.preprocess(frame), hough_params)
+
+    @staticmethod
+    def preprocess(frame, gray=None, blurred=None):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+        return cv2.GaussianBlur(gray, (9, 9), 2, dst=blurred)
+
+    @staticmethod
+    def hough_circles(gray, hough_params):
         circles = cv2.HoughCircles(
             gray,
             cv2.HOUGH_GRADIENT,
@@ -1,26 +1,84 @@
+import time
 import cv2
-from ptcam.tracker import Tracker, DistanceCalculator
+from ptcam.tracker.tracker import Tracker
+from ptcam.tracker.distance_calculator import DistanceCalculator
+from ptcam.tracker.motion_detector import MotionDetector
+from ptcam.tracker.trajectory_store import TrajectoryStore
+from ptcam.tracker.latency_tracer import LatencyTracer
+from ptcam.tracker.buffer_pool import BufferPool
+from ptcam.tracker.capture_source import CONNECTED
 
 class TrackerProcessor:
-    def __init__(self, config):
+    def __init__(self, config, tracer=None, pool=None):
         self.config = config
-        self.tracker = Tracker(config)
+        self.tracer = tracer or LatencyTracer(config)
+        self.pool = pool or BufferPool(config)
+        self.scale = config.get("processing_scale", 1.0)
+        self.reset_after_outage = config.get("capture.reset_trackers_after_sec", 5.0)
+        self.tracker = Tracker(config, self.pool)
         self.distance_calculator = DistanceCalculator(config)
+        self.motion_detector = MotionDetector(config, self.pool) if config.get("motion_gate.enabled", True) else None
+        self.last_detection_empty = False
+        self.trajectories = TrajectoryStore(config)
 
-    def process_frame(self, frame):
+    def process_frame(self, frame, timestamp=None, frame_info=None):
         height, width = frame.shape[:2]
-        ok, boxes = self.tracker.update(frame)
+        with self.tracer.span("track", frame_info):
+            scaled = self.scale_frame(frame)
+            ok, boxes = self.tracker.update(scaled)
+        reinitialized = False
         if not ok or len(boxes) == 0:
-            circles = self.tracker.detect_circles_in_frame(frame)
-            if circles:
-                self.tracker.reset_trackers()
-                self.tracker.add_circles_to_multitracker(frame, circles)
+            with self.tracer.span("detect", frame_info):
+                circles = self.detect_circles(scaled)
+                if circles:
+                    self.tracker.reset_trackers()
+                    self.tracker.add_circles_to_multitracker(scaled, circles)
+                    # トラッカーが再初期化されると ID が振り直されるため履歴を破棄する
+                    self.trajectories.reset()
+                    reinitialized = True
+        else:
+            self.last_detection_empty = False
 
         results = []
-        for x, y, w, h in boxes:
-            distance = self.distance_calculator.calculate_distance(w, h, width, height)
-            results.append(((x, y, w, h), distance))
+        with self.tracer.span("distance", frame_info):
+            for box in boxes:
+                # 距離はフル解像度の座標で計算する
+                x, y, w, h = (v / self.scale for v in box)
+                distance = self.distance_calculator.calculate_distance(w, h, width, height)
+                results.append(((x, y, w, h), distance))
+        if results and not reinitialized:
+            self.trajectories.update(time.time() if timestamp is None else timestamp, results)
         return results
 
+    def scale_frame(self, frame):
+        if self.scale == 1.0:
+            return frame
+        height, width = frame.shape[:2]
+        size = (max(1, int(round(width * self.scale))), max(1, int(round(height * self.scale))))
+        scaled = self.pool.scratch("scaled", (size[1], size[0]) + frame.shape[2:], frame.dtype)
+        return cv2.resize(frame, size, dst=scaled, interpolation=cv2.INTER_AREA)
+
+    def detect_circles(self, frame):
+        if self.motion_detector is None:
+            return self.tracker.detect_circles_in_frame(frame)
+
+        # 前回検出できなかった場合は動きのあった領域だけを再探索する
+        regions = self.motion_detector.detect(frame)
+        if self.last_detection_empty and not regions:
+            return []
+
+        circles = self.tracker.detect_circles_in_frame(frame, regions if self.last_detection_empty else None)
+        self.last_detection_empty = not circles
+        return circles
+
+    def on_capture_state(self, state, metrics):
+        # 短い切断ではトラッカーを維持し、長い切断の後だけリセットする
+        if state == CONNECTED and metrics["last_outage_sec"] > self.reset_after_outage:
+            self.reset_trackers()
+
     def reset_trackers(self):
-        self.tracker.reset_trackers()
\ No newline at end of file
+        self.tracker.reset_trackers()
+        self.last_detection_empty = False
+        self.trajectories.reset()
+        if self.motion_detector is not None:
+            self.motion_detector.reset()
\ No newline at end of file
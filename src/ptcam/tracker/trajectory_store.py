@@ -0,0 +1,113 @@
+import numpy as np
+
+# 列: timestamp, x, y, w, h, distance (未計測は NaN)
+TIMESTAMP, X, Y, W, H, DISTANCE = range(6)
+
+
+class Trajectory:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.full((capacity, 6), np.nan, dtype=np.float64)
+        self.head = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, timestamp, box, distance):
+        row = self.data[self.head]
+        row[TIMESTAMP] = timestamp
+        row[X:H + 1] = box
+        row[DISTANCE] = np.nan if distance is None else distance
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last(self, n=None):
+        # 古い順に並べた直近 n 件
+        n = self.count if n is None else min(n, self.count)
+        indices = (self.head - n + np.arange(n)) % self.capacity
+        return self.data[indices]
+
+    def centers(self, n=None):
+        rows = self.last(n)
+        return rows[:, [X, Y]] + rows[:, [W, H]] / 2
+
+    def smoothed_distance(self, window=10):
+        distances = self.last(window)[:, DISTANCE]
+        distances = distances[~np.isnan(distances)]
+        if len(distances) == 0:
+            return None
+        weights = np.arange(1, len(distances) + 1, dtype=np.float64)
+        return float(np.average(distances, weights=weights))
+
+    def velocity(self, window=10):
+        # 最小二乗で求めた中心座標 (px/s) と距離 (mm/s) の変化率
+        rows = self.last(window)
+        if len(rows) < 2:
+            return None
+        t = rows[:, TIMESTAMP] - rows[-1, TIMESTAMP]
+        t_centered = t - t.mean()
+        denominator = np.dot(t_centered, t_centered)
+        if denominator == 0:
+            return None
+        centers = rows[:, [X, Y]] + rows[:, [W, H]] / 2
+        vx, vy = t_centered @ (centers - centers.mean(axis=0)) / denominator
+
+        distance_rate = None
+        valid = ~np.isnan(rows[:, DISTANCE])
+        if valid.sum() >= 2:
+            td = t[valid] - t[valid].mean()
+            if np.dot(td, td) > 0:
+                distances = rows[valid, DISTANCE]
+                distance_rate = float(td @ (distances - distances.mean()) / np.dot(td, td))
+        return float(vx), float(vy), distance_rate
+
+    def time_to_reach(self, point, window=10):
+        # 現在の速度で point に最も近づくまでの秒数（遠ざかっている場合は None）
+        velocity = self.velocity(window)
+        if velocity is None:
+            return None
+        v = np.array(velocity[:2])
+        speed_sq = np.dot(v, v)
+        if speed_sq == 0:
+            return None
+        offset = np.asarray(point, dtype=np.float64) - self.centers(1)[0]
+        t = np.dot(offset, v) / speed_sq
+        return float(t) if t >= 0 else None
+
+    def time_to_distance(self, target_mm, window=10):
+        velocity = self.velocity(window)
+        current = self.smoothed_distance(window)
+        if velocity is None or velocity[2] is None or current is None or velocity[2] == 0:
+            return None
+        t = (target_mm - current) / velocity[2]
+        return float(t) if t >= 0 else None
+
+
+class TrajectoryStore:
+    def __init__(self, config):
+        self.config = config
+        self.capacity = config.get("trajectory.capacity", 300)
+        self.max_age = config.get("trajectory.max_age_sec", 5.0)
+        self.trajectories = {}
+
+    def update(self, timestamp, results):
+        for track_id, (box, distance) in enumerate(results):
+            trajectory = self.trajectories.get(track_id)
+            if trajectory is None:
+                trajectory = self.trajectories[track_id] = Trajectory(self.capacity)
+            trajectory.append(timestamp, box, distance)
+        self.evict_stale(timestamp)
+
+    def evict_stale(self, timestamp):
+        for track_id in [k for k, t in self.trajectories.items() if timestamp - t.last(1)[0, TIMESTAMP] > self.max_age]:
+            del self.trajectories[track_id]
+
+    def get(self, track_id):
+        return self.trajectories.get(track_id)
+
+    def track_ids(self):
+        return list(self.trajectories.keys())
+
+    def reset(self):
+        self.trajectories = {}
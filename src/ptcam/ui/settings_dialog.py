@@ -30,6 +30,13 @@ class SettingsDialog(QDialog):
         self.skip_frames_input.setMaximum(1000)
         self.skip_frames_input.setValue(self.config.get("skip_frames", 0))
         general_layout.addRow("Skip Frames:", self.skip_frames_input)
+
+        self.processing_scale_input = QDoubleSpinBox()
+        self.processing_scale_input.setDecimals(2)
+        self.processing_scale_input.setSingleStep(0.05)
+        self.processing_scale_input.setRange(0.1, 1.0)
+        self.processing_scale_input.setValue(self.config.get("processing_scale", 1.0))
+        general_layout.addRow("Processing Scale:", self.processing_scale_input)
         general_group.setLayout(general_layout)
         layout.addWidget(general_group)
 
@@ -142,6 +149,7 @@ class SettingsDialog(QDialog):
         self.config.set("rtsp_url", self.rtsp_url_input.text())
         self.config.set("screenshot_dir", self.screenshot_dir_input.text())
         self.config.set("skip_frames", self.skip_frames_input.value())
+        self.config.set("processing_scale", self.processing_scale_input.value())
         self.config.set("hough_params.dp", self.hough_dp_input.value())
         self.config.set("hough_params.min_dist", self.hough_min_dist_input.value())
         self.config.set("hough_params.param1", self.hough_param1_input.value())
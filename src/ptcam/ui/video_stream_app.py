@@ -3,6 +3,7 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QImage, QPixmap
 from ptcam.ui.settings_dialog import SettingsDialog
 from ptcam.tracker.gui_tracker_runner import GUITrackerRunner
+from ptcam.stream.annotator import draw_results
 from ptcam.config.config import Config
 import cv2
 
@@ -14,6 +15,7 @@ class VideoStreamApp(QMainWindow):
         self.runner = GUITrackerRunner(config)
         self.runner.frame_processed.connect(self.update_frame)
         self.runner.error_signal.connect(self.handle_error)
+        self.runner.capture_state_changed.connect(self.handle_capture_state)
         self.init_ui()
 
     def init_ui(self):
@@ -35,6 +37,14 @@ class VideoStreamApp(QMainWindow):
         self.clear_tracker_button.clicked.connect(self.clear_tracker)
         button_panel.addWidget(self.clear_tracker_button)
 
+        self.snapshot_button = QPushButton("Snapshot", self)
+        self.snapshot_button.clicked.connect(self.take_snapshot)
+        button_panel.addWidget(self.snapshot_button)
+
+        self.record_clip_button = QPushButton("Record Clip", self)
+        self.record_clip_button.clicked.connect(self.record_clip)
+        button_panel.addWidget(self.record_clip_button)
+
         button_panel.addStretch()
         main_layout.addLayout(button_panel)
 
@@ -57,25 +67,33 @@ class VideoStreamApp(QMainWindow):
     def stop_tracking(self):
         self.runner.stop_tracking()
 
-    def update_frame(self, frame, data):
+    def update_frame(self, frame, data, frame_info=None):
         if frame is None:
             return
 
+        with self.runner.tracer.span("render", frame_info):
+            self.render_frame(frame, data)
+        self.runner.pool.release(frame)
+        self.runner.tracer.complete(frame_info)
+
+    def render_frame(self, frame, data):
         height, width, _ = frame.shape
+        # 録画用のフレームに描画しないようコピーに描く
+        annotated = self.runner.pool.scratch("annotated", frame.shape)
+        annotated[...] = frame
 
-        for i, ((x, y, w, h), distance) in enumerate(data):
-            cv2.rectangle(frame, (int(x), int(y)), (int(x + w), int(y + h)), (0, 0, 255), 2)
-            label_text = f"Tracker{i}: {distance:.2f} mm" if distance is not None else f"Tracker{i}: Distance N/A"
-            cv2.putText(frame, label_text, (int(x), int(y) - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+        draw_results(annotated, data)
 
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame = cv2.cvtColor(annotated, cv2.COLOR_BGR2RGB, dst=self.runner.pool.scratch("rgb", frame.shape))
         qt_image = QImage(frame.data, width, height, 3 * width, QImage.Format_RGB888)
         self.video_label.setPixmap(QPixmap.fromImage(qt_image))
 
     def handle_error(self, message):
         print(f"Error: {message}")
 
+    def handle_capture_state(self, state, metrics):
+        self.statusBar().showMessage(f"Stream {state} (reconnects: {metrics['reconnects']})")
+
     def open_settings_dialog(self):
         dialog = SettingsDialog(self.config, self)
         if dialog.exec_():
@@ -84,11 +102,18 @@ class VideoStreamApp(QMainWindow):
             self.runner = GUITrackerRunner(self.config)
             self.runner.frame_processed.connect(self.update_frame)
             self.runner.error_signal.connect(self.handle_error)
+            self.runner.capture_state_changed.connect(self.handle_capture_state)
             self.runner.start_tracking()
 
     def clear_tracker(self):
         self.runner.reset_trackers()
 
+    def take_snapshot(self):
+        self.runner.recorder.snapshot()
+
+    def record_clip(self):
+        self.runner.recorder.record_clip()
+
     def closeEvent(self, event):
         self.runner.stop_tracking()
         super().closeEvent(event)
\ No newline at end of file